@@ -9,31 +9,38 @@ from ctypes import *
 
 # -- Begin loader template --
 
+import os
 import sys
 import ctypes
 import ctypes.util
-import pathlib
+import functools
 
+if sys.platform in ("win32", "cygwin", "msys"):
+    _LIBNAME_PATTERNS = ("{}.dll", "lib{}.dll", "{}")
+elif sys.platform == "darwin":
+    _LIBNAME_PATTERNS = ("lib{}.dylib", "{}.dylib", "lib{}.so", "{}.so", "{}")
+else:  # assume unix pattern or plain name
+    _LIBNAME_PATTERNS = ("lib{}.so", "{}.so", "{}")
+
+# the system search may spawn subprocesses and does not depend on our location, so cache it separately
+_find_sys_library = functools.lru_cache(maxsize=None)(ctypes.util.find_library)
+
+@functools.lru_cache(maxsize=None)
 def _find_library(name, dirs, search_sys):
     
-    if sys.platform in ("win32", "cygwin", "msys"):
-        patterns = ["{}.dll", "lib{}.dll", "{}"]
-    elif sys.platform == "darwin":
-        patterns = ["lib{}.dylib", "{}.dylib", "lib{}.so", "{}.so", "{}"]
-    else:  # assume unix pattern or plain name
-        patterns = ["lib{}.so", "{}.so", "{}"]
-    
+    candidates = [pat.format(name) for pat in _LIBNAME_PATTERNS]
+    here = None  # resolved lazily, only needed for relative dirs
     for dir in dirs:
-        dir = pathlib.Path(dir)
-        if not dir.is_absolute():
-            # NOTE joining an absolute path silently discardy the path before
-            dir = (pathlib.Path(__file__).parent / dir).resolve(strict=False)
-        for pat in patterns:
-            libpath = dir / pat.format(name)
-            if libpath.is_file():
-                return str(libpath)
+        if not os.path.isabs(dir):
+            if here is None:
+                here = os.path.dirname(__file__)
+            dir = os.path.realpath(os.path.join(here, dir))
+        for filename in candidates:
+            libpath = os.path.join(dir, filename)
+            if os.path.isfile(libpath):
+                return libpath
     
-    libpath = ctypes.util.find_library(name) if search_sys else None
+    libpath = _find_sys_library(name) if search_sys else None
     if not libpath:
         raise ImportError(f"Could not find library '{name}' (dirs={dirs}, search_sys={search_sys})")
     
@@ -41,9 +48,9 @@ def _find_library(name, dirs, search_sys):
 
 _libs_info, _libs = {}, {}
 
-def _register_library(name, dllclass, **kwargs):
-    libpath = _find_library(name, **kwargs)
-    _libs_info[name] = {**kwargs, "path": libpath}
+def _register_library(name, dllclass, dirs, search_sys):
+    libpath = _find_library(name, tuple(dirs), search_sys)
+    _libs_info[name] = {"dirs": dirs, "search_sys": search_sys, "path": libpath}
     _libs[name] = dllclass(libpath)
 
 # -- End loader template --
@@ -62,8 +69,11 @@ _register_library(
 # -- Begin header members --
 
 # ./demolib.h: 3
-if hasattr(_libs['demolib'], 'trivial_add'):
+try:
     trivial_add = _libs['demolib']['trivial_add']
+except AttributeError:
+    pass
+else:
     trivial_add.argtypes = [c_int, c_int]
     trivial_add.restype = c_int
 
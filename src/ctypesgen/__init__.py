@@ -40,23 +40,32 @@ parser, processor, and printer modules use to pass information. They are:
 format.
 """
 
-# Worker modules
-from . import parser
-from . import processor
-from . import printer_python
-from . import printer_json
 from . import version
 
-# Data structure modules
-from . import descriptions
-from . import ctypedescs
-from . import expressions
-
-# Helper modules
-from . import messages
-
-# Entry points
-from .__main__ import main, api_main
+# Submodules and entry points are imported lazily on first attribute access (PEP 562), so that importing the package does not pay for the parser and its tables up front.
+
+_LAZY_MODULES = {
+    # Worker modules
+    "parser", "processor", "printer_python", "printer_json",
+    # Data structure modules
+    "descriptions", "ctypedescs", "expressions",
+    # Helper modules
+    "messages",
+}
+_LAZY_ENTRYPOINTS = {"main", "api_main"}
+
+def __getattr__(name):
+    import importlib
+    if name in _LAZY_MODULES:
+        return importlib.import_module(f".{name}", __name__)
+    elif name in _LAZY_ENTRYPOINTS:
+        value = getattr(importlib.import_module(".__main__", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted({*globals(), *_LAZY_MODULES, *_LAZY_ENTRYPOINTS})
 
 __version__ = version.VERSION.partition("-")[-1]
 VERSION = __version__
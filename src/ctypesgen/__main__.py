@@ -2,10 +2,10 @@ import re
 import sys
 import shlex
 import shutil
+import functools
 import importlib
 import contextlib
 import argparse
-import itertools
 from pathlib import Path
 from pprint import pformat
 
@@ -29,11 +29,18 @@ def main(given_argv=sys.argv[1:]):
     get_priv_paths.cache_clear()  # preparation: refresh CWD for path stripping
     args = get_parser().parse_args(given_argv)
     postparse(args)
-    cmd_str = " ".join(["ctypesgen"] + [shlex.quote(txtpath(a)) for a in given_argv])
-    main_impl(args, cmd_str)
+    main_impl(args, get_cmd_str(given_argv))
+
+def get_cmd_str(given_argv):
+    return " ".join(["ctypesgen"] + [shlex.quote(txtpath(a)) for a in given_argv])
 
 def postparse(args):
-    args.cppargs = list( itertools.chain(*args.cppargs) )
+    # resolve and check paths in one go once parsing succeeded, rather than through argparse type hooks
+    args.headers = [input_file_t(p) for p in args.headers]
+    args.inserted_files = [input_file_t(p) for p in args.inserted_files]
+    args.output = generic_path_t(args.output)
+    if args.linkage_anchor:
+        args.linkage_anchor = input_dir_t(args.linkage_anchor)
 
 
 # -- Pure API entry point (experimental) --
@@ -54,6 +61,8 @@ def api_main(args):
     
     real_args = defaults.copy()
     real_args.update(args)
+    # accept symbol rules both as "RULE=exp" strings, like on the command line, and as pre-parsed pairs
+    real_args["symbol_rules"] = [symbol_rule_t(r) if isinstance(r, str) else r for r in real_args["symbol_rules"]]
     real_args = argparse.Namespace(**real_args)
     
     args_str = str(pformat(args))
@@ -69,7 +78,9 @@ def _get_parser_defaults(parser):
     for action in parser._actions:
         if (not action.required and action.default is not argparse.SUPPRESS
             and action.dest not in ("help", "version")):
-            defaults[action.dest] = action.default
+            # defaults are scalars or lists, so a shallow list copy suffices to decouple the caller's namespace from the parser
+            default = action.default
+            defaults[action.dest] = list(default) if isinstance(default, list) else default
     return defaults
 
 def _get_parser_requires(parser):
@@ -79,6 +90,14 @@ def _get_parser_requires(parser):
 # -- Main implementation --
 
 def main_impl(args, cmd_str):
+    prepare_args(args)
+    raw_data = core_parser.parse(args.headers, args)
+    process_and_print(raw_data, args, cmd_str)
+
+
+# main_impl() is split in stages so that callers (e.g. the test suite) may parse once and print the same data in multiple output languages
+
+def prepare_args(args):
     
     assert args.headers or args.system_headers, "Either --headers or --system-headers required."
     
@@ -90,23 +109,19 @@ def main_impl(args, cmd_str):
     if args.cpp:
         assert shutil.which(args.cpp[0]), f"Given pre-processor {args.cpp[0]!r} is not available."
     else:
-        if shutil.which("gcc"):
-            args.cpp = ["gcc", "-E"]
-        elif shutil.which("cpp"):
-            args.cpp = ["cpp"]
-        elif shutil.which("clang"):
-            args.cpp = ["clang", "-E"]
-        else:
-            raise RuntimeError("C pre-processor auto-detection failed: neither gcc nor clang available.")
+        args.cpp = find_default_cpp()
     
     # Important: must not use +=, this would mutate the original object, which is problematic when default=[] is used and ctypesgen called repeatedly from within python
-    args.compile_libdirs = args.compile_libdirs + args.universal_libdirs
-    args.runtime_libdirs = args.runtime_libdirs + args.universal_libdirs
+    # Drop duplicates (keeping order), so the library loader won't probe the same dir twice
+    args.compile_libdirs = list(dict.fromkeys(args.compile_libdirs + args.universal_libdirs))
+    args.runtime_libdirs = list(dict.fromkeys(args.runtime_libdirs + args.universal_libdirs))
     
     # Figure out what names will be defined by linked-in python modules
     args.linked_symbols = find_symbols_in_modules(args.modules, args.output, args.linkage_anchor)
+
+
+def process_and_print(raw_data, args, cmd_str):
     
-    raw_data = core_parser.parse(args.headers, args)
     processor.process(raw_data, args)
     data = [(k, d) for k, d in raw_data.output_order if d.included]
     if not data:
@@ -122,12 +137,29 @@ def main_impl(args, cmd_str):
 
 # -- Helper functions for main_impl() --
 
+# pre-processor auto-detection candidates, in order of preference
+DEFAULT_CPPS = {
+    "gcc": ["gcc", "-E"],
+    "cpp": ["cpp"],
+    "clang": ["clang", "-E"],
+}
+
+def find_default_cpp():
+    # which() stops at the first match, and the preferred candidate is usually present
+    for name, cmd in DEFAULT_CPPS.items():
+        if shutil.which(name):
+            return list(cmd)
+    raise RuntimeError("C pre-processor auto-detection failed: neither gcc nor clang available.")
+
+
 def find_symbols_in_modules(modnames, outpath, anchor):
     
     # NOTE(geisserml) Concerning relative imports, I've been unable to find another way than adding the output dir's parent to sys.path, given that the module itself may contain relative imports.
     # It seems like this may be a limitation of python's import system, though technically one would imagine the output dir's path itself should be sufficient.
     
     assert isinstance(modnames, (tuple, list))  # not str
+    if not modnames:
+        return set()
     assert isinstance(outpath, Path) and outpath.is_absolute()
     if anchor:
         assert isinstance(anchor, Path) and anchor.is_absolute()
@@ -148,7 +180,11 @@ def find_symbols_in_modules(modnames, outpath, anchor):
             with tmp_searchpath(anchor.parent):
                 module = importlib.import_module(import_path, anchor.name)
         
-        module_syms = [s for s in dir(module) if not re.fullmatch(r"__\w+__", s)]
+        # honor an explicit export list, since that is what the star import in the output will take over
+        if hasattr(module, "__all__"):
+            module_syms = list(module.__all__)
+        else:
+            module_syms = [s for s in dir(module) if not (len(s) > 4 and s.startswith("__") and s.endswith("__"))]
         assert len(module_syms) > 0, f"No symbols found in module {module.__name__!r} - linkage would be pointless"
         msgs.status_message(f"Symbols found in {module.__name__!r}: {module_syms}")
         symbols.update(module_syms)
@@ -222,6 +258,29 @@ def input_dir_t(p):
     return checked_path_t(p, check=Path.is_dir, exc=FileNotFoundError)
 
 
+def symbol_rule_t(entry):
+    # parse and compile once, so that the processor can directly apply the rules
+    rule_name, sep, symbols_regex = entry.partition("=")
+    if not sep or rule_name not in ("never", "if_needed", "yes"):
+        raise argparse.ArgumentTypeError(f"Invalid symbol rule {entry!r}, expected RULE=exp with RULE one of [never, if_needed, yes]")
+    try:
+        return rule_name, re.compile(symbols_regex)
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"Invalid regular expression in symbol rule {entry!r}: {e}")
+
+
+class CppArgsAction (argparse.Action):
+    # -D/-U share one flat list of [FLAG, NAME, ...] so that their relative order is retained
+    def __call__(self, parser, namespace, values, option_string=None):
+        items = list(getattr(namespace, self.dest) or [])
+        for value in values:
+            items += (self.const, value)
+        setattr(namespace, self.dest, items)
+
+
+# The parser holds no per-call state, so build it only once and share it across repeated calls from within python.
+# Actions must not mutate their defaults in place, since those are shared as well.
+@functools.lru_cache(maxsize=1)
 def get_parser():
     
     # FIXME argparse parameters are not ordered consistently...
@@ -233,7 +292,8 @@ def get_parser():
         
         class ExtendAction(argparse.Action):
             def __call__(self, parser, namespace, values, option_string=None):
-                items = getattr(namespace, self.dest) or []
+                # copy, like the native extend action does, so we don't mutate the default list
+                items = list(getattr(namespace, self.dest) or [])
                 items.extend(values)
                 setattr(namespace, self.dest, items)
         
@@ -253,7 +313,7 @@ def get_parser():
         dest="headers",
         nargs="+",
         action="extend",
-        type=input_file_t,
+        type=Path,
         default=[],
         help="Sequence of header files",
     )
@@ -265,7 +325,7 @@ def get_parser():
     parser.add_argument(
         "-o", "--output",
         required=True,
-        type=generic_path_t,
+        type=Path,
         metavar="FILE",
         help="Write bindings to FILE. Beware: If FILE exists already, it will be silently overwritten.",
     )
@@ -290,7 +350,7 @@ def get_parser():
     )
     parser.add_argument(
         "--linkage-anchor",
-        type=input_dir_t,
+        type=Path,
         help="The top-level package to use as anchor when importing relative linked modules at compile time. Further, --no-embed-templates needs to know the package root to handle shared templates and libraries. To avoid ambiguity, this option is mandatory in both cases.",
     )
     parser.add_argument(
@@ -348,9 +408,9 @@ def get_parser():
     parser.add_argument(
         "-D", "--define",
         dest="cppargs",
-        type=lambda n: ("-D", n),
+        const="-D",
         nargs="+",
-        action="extend",
+        action=CppArgsAction,
         default=[],
         metavar="NAME",
         help="Add a definition to the preprocessor via commandline",
@@ -358,9 +418,9 @@ def get_parser():
     parser.add_argument(
         "-U", "--undefine",
         dest="cppargs",
-        type=lambda n: ("-U", n),
+        const="-U",
         nargs="+",
-        action="extend",
+        action=CppArgsAction,
         default=[],
         metavar="NAME",
         help="Instruct the preprocessor to undefine the specified macro via commandline",
@@ -416,6 +476,7 @@ def get_parser():
     )
     parser.add_argument(
         "--symbol-rules",
+        type=symbol_rule_t,
         nargs="+",
         action="extend",
         default=[],
@@ -447,7 +508,7 @@ def get_parser():
     parser.add_argument(
         "--insert-files",
         dest="inserted_files",
-        type=input_file_t,
+        type=Path,
         nargs="+",
         action="extend",
         default=[],
@@ -471,7 +532,7 @@ def get_parser():
         "--no-symbol-guards",
         dest="guard_symbols",
         action="store_false",
-        help="Do not add hasattr(...) if-guards around binary symbols. Use when input headers and runtime binary are guaranteed to match. If missing symbols are encountered during library loading, they will be excluded from the output.",
+        help="Do not guard binary symbols against absence in the runtime library. Use when input headers and runtime binary are guaranteed to match. If missing symbols are encountered during library loading, they will be excluded from the output.",
     )
     parser.add_argument(
         "--no-macro-guards",
@@ -75,6 +75,10 @@ class StringLiteral(str):
         value = value[1:-1]  # .decode('string_escape')
         return str.__new__(cls, value)
 
+    def __getnewargs__(self):
+        # re-quote for __new__, so instances survive copy/pickle
+        return ('"' + self + '"', )
+
 
 # --------------------------------------------------------------------------
 # Token declarations
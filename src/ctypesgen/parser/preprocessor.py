@@ -10,6 +10,7 @@ import re
 import sys
 import copy
 import shlex
+import functools
 import subprocess
 from pathlib import Path
 
@@ -50,6 +51,19 @@ class PreprocessorLexer(lex.Lexer):
         return result
 
 
+@functools.lru_cache(maxsize=None)
+def _get_lexer_template(optimize):
+    # Building the lexer compiles the master regexes of all token rules, which is a noticeable part of a (small) run.
+    # Do it only once per process and give each parser a clone. The lexer only carries state in plain attributes, which clone() copies.
+    return lex.lex(
+        cls=PreprocessorLexer,
+        optimize=optimize,
+        lextab="lextab",
+        outputdir=os.path.dirname(__file__),
+        module=pplexer,
+    )
+
+
 # --------------------------------------------------------------------------
 # Grammars
 # --------------------------------------------------------------------------
@@ -85,13 +99,7 @@ class PreprocessorParser:
         
         self.matches = []
         self.output = []
-        self.lexer = lex.lex(
-            cls=PreprocessorLexer,
-            optimize=options.optimize_lexer,
-            lextab="lextab",
-            outputdir=os.path.dirname(__file__),
-            module=pplexer,
-        )
+        self.lexer = _get_lexer_template(options.optimize_lexer).clone()
     
     
     def _get_default_flags(self):
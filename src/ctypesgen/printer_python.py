@@ -154,8 +154,8 @@ _register_library(
         self._srcinfo(function.src)
         
         # we have to do string based attribute access because the CN might conflict with a python keyword, while the PN is supposed to be renamed
-        template = """\
-{PN} = _libs['{L}']['{CN}']
+        lookup = "{PN} = _libs['{L}']['{CN}']"
+        setup = """\
 {PN}.argtypes = [{ATS}]
 {PN}.restype = {RT}\
 """
@@ -167,11 +167,14 @@ _register_library(
             RT=function.restype.py_string(),
         )
         if function.errcheck:
-            template += "\n{PN}.errcheck = {EC}"
+            setup += "\n{PN}.errcheck = {EC}"
             fields["EC"] = function.errcheck.py_string()
         
         if self.opts.guard_symbols:
-            template = "if hasattr(_libs['{L}'], '{CN}'):\n" + indent(template, prefix=" "*4)
+            # a failed lookup raises AttributeError, so this resolves the symbol only once, unlike a hasattr() check
+            template = f"try:\n    {lookup}\nexcept AttributeError:\n    pass\nelse:\n{indent(setup, prefix=' '*4)}"
+        else:
+            template = f"{lookup}\n{setup}"
         
         self.file.write(template.format(**fields))
     
@@ -4,7 +4,6 @@ DescriptionCollection and prepare it for output.
 ctypesgen.processor.pipeline calls the operations module.
 """
 
-import re
 import sys
 import ctypes
 import keyword
@@ -65,11 +64,8 @@ def remove_macros(data, opts):
 
 
 def filter_by_regex_rules(data, opts):
-    for rule_entry in opts.symbol_rules:
-        rule_name, symbols_regex = rule_entry.split("=", maxsplit=1)
-        if rule_name not in {"never", "if_needed", "yes"}:
-            raise ValueError(f"Unknown include rule {rule_name!r}")
-        expr = re.compile(symbols_regex)
+    # symbol rules are (rule_name, compiled_regex) pairs, validated by the argument parser
+    for rule_name, expr in opts.symbol_rules:
         for desc in data.all:
             if expr.fullmatch(desc.py_name()):
                 desc.include_rule = rule_name
@@ -181,6 +177,8 @@ def check_symbols(data, opts):
     
     try:
         libraryloader.__file__ = str(Path.cwd() / "spoofed_ll.py")
+        libraryloader._find_library.cache_clear()  # relative dirs depend on the spoofed location
+        libraryloader._find_sys_library.cache_clear()  # the system may have changed since a previous in-process run
         libraryloader._register_library(
             name = opts.library,
             dllclass = getattr(ctypes, opts.dllclass),
@@ -1,7 +1,11 @@
 import os
+import re
 import sys
 import json
 import atexit
+import hashlib
+import functools
+import copy
 import types
 import shlex
 import shutil
@@ -13,11 +17,19 @@ import ctypesgen.__main__
 
 
 TEST_DIR = Path(__file__).resolve().parent
-COMMON_DIR = TEST_DIR/"common"
-TMP_DIR = TEST_DIR/"tmp"
+# with pytest-xdist, give each worker process its own data dirs so they don't race on each other's files
+WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", None)
+_DIR_SUFFIX = f"_{WORKER_ID}" if WORKER_ID else ""
+COMMON_DIR = TEST_DIR/f"common{_DIR_SUFFIX}"
+TMP_DIR = TEST_DIR/f"tmp{_DIR_SUFFIX}"
 
 CLEANUP_OK = bool(int(os.environ.get("CLEANUP_OK", "1")))
 MAIN_CPP = os.environ.get("CPP", None)
+# opt-in on-disk cache of generated outputs, to speed up repeated runs during development
+# entries are keyed by the generate() inputs and the ctypesgen sources, so code changes invalidate them; changes to other files read by ctypesgen do not, though
+# calls with linked modules or local #include "..." files are therefore not cached, but changes to system headers still go unnoticed
+CACHE_OK = bool(int(os.environ.get("CTYPESGEN_TEST_CACHE", "0")))
+CACHE_DIR = TEST_DIR/".gencache"
 
 
 def _remove_tmpdir():
@@ -46,45 +58,115 @@ def module_from_code(name, python_code):
     return module
 
 
+@functools.lru_cache(maxsize=1)
+def _get_sources_hash():
+    hasher = hashlib.sha1()
+    src_dir = Path(ctypesgen.__main__.__file__).parent
+    for path in sorted(src_dir.glob("**/*.py")):
+        hasher.update(str(path.relative_to(src_dir)).encode("utf-8"))
+        hasher.update(path.read_bytes())
+    return hasher.hexdigest()
+
+def _get_cache_file(*key_data):
+    key_data = json.dumps([*key_data, _get_sources_hash()], default=str)
+    return CACHE_DIR/f"{hashlib.sha1(key_data.encode('utf-8')).hexdigest()}.json"
+
+def _is_cacheable(header, args):
+    # the cache key does not cover linked modules or local includes, see CACHE_OK
+    linked = any(a in ("-m", "--modules", "--link-modules") for a in map(str, args))
+    return not linked and not (header and re.search(r'#\s*include\s*"', header))
+
+def _load_output(content, lang):
+    if lang.startswith("py"):
+        return module_from_code("tmp_module", content)
+    elif lang == "json":
+        return json.loads(content)
+    else:
+        assert False
+
+
 COUNTER = 0
 
-def generate(header=None, args=[], lang="py", cpp=MAIN_CPP, allow_gnuc=False):
+def get_file_id(name=None):
+    # Files are named after the requesting test so they can be told apart with partial test suite runs; the counter keeps them unique
+    global COUNTER; COUNTER += 1
+    return f"{COUNTER:02d}_{name}" if name else f"{COUNTER:02d}"
+
+
+def generate(header=None, args=[], lang="py", cpp=MAIN_CPP, allow_gnuc=False, name=None):
+    output, tmp_in = generate_multi(header, args, (lang, ), cpp, allow_gnuc, name)
+    return (output, tmp_in) if lang == "json" else output
+
+
+def generate_multi(header=None, args=[], langs=("py", "json"), cpp=MAIN_CPP, allow_gnuc=False, name=None):
+    # Returns the outputs in order of langs, followed by the header path. The header is only parsed once for all output languages.
+    # `name` identifies the caller (usually the test class) in the names of the temporary files.
     
     # Windows notes:
     # - Avoid stdlib tempfiles, they're not usable by anyone except the direct creator, otherwise you'll get permission errors.
     # - The default file encoding seems to be cp1252, which is problematic with special chars (such as the banana in the constants test). Need to specify UTF-8 explicitly. PEP 686 should hopefully improve this.
     
     # Use custom tempfiles scoping so we may retain data for inspection
-    # FIXME can cause confusion with partial test suite runs - static naming by test case would be better, including more descriptive
-    global COUNTER; COUNTER += 1
+    file_id = get_file_id(name)
+    
+    use_cache = CACHE_OK and _is_cacheable(header, args)
+    if use_cache:
+        cache_file = _get_cache_file(header, args, langs, cpp, allow_gnuc)
+        if cache_file.exists():
+            cached = json.loads(cache_file.read_text(encoding="utf-8"))
+            return (*[_load_output(c, l) for c, l in zip(cached["contents"], langs)], cached["tmp_in"])
     
     cmdargs = []
     tmp_in = None
     if header != None:
-        tmp_in = TMP_DIR/f"in_header_{COUNTER:02d}.h"
+        tmp_in = TMP_DIR/f"in_header_{file_id}.h"
         tmp_in.write_text(header.strip() + "\n", encoding="utf-8")
         cmdargs += ["-i", tmp_in]
     
     if cpp: cmdargs += ["--cpp", cpp]
     if allow_gnuc: cmdargs += ["-X", "__GNUC__"]
-    cmdargs += ["--output-language", lang] + args
     
+    tmp_outs = [TMP_DIR/f"out_bindings_{file_id}.{lang}" for lang in langs]
+    all_cmdargs = [[*cmdargs, "--output-language", lang, *args, "-o", tmp_out] for lang, tmp_out in zip(langs, tmp_outs)]
     try:
-        tmp_out = TMP_DIR/f"out_bindings_{COUNTER:02d}.{lang}"
-        cmdargs += ["-o", tmp_out]
-        ctypesgen_main(cmdargs)
-        content = tmp_out.read_text(encoding="utf-8")
+        if len(langs) == 1:
+            ctypesgen_main(all_cmdargs[0])
+        else:
+            _ctypesgen_main_multi(all_cmdargs)
+        contents = [p.read_text(encoding="utf-8") for p in tmp_outs]
     finally:
         if CLEANUP_OK:
             if tmp_in: tmp_in.unlink()
-            tmp_out.unlink()
+            for p in tmp_outs:
+                if p.exists(): p.unlink()
     
-    if lang.startswith("py"):
-        return module_from_code("tmp_module", content)
-    elif lang == "json":
-        return json.loads(content), str(tmp_in)
-    else:
-        assert False
+    # the json output embeds the header path, so keep it along with the cached contents
+    tmp_in = str(tmp_in)
+    if use_cache:
+        CACHE_DIR.mkdir(exist_ok=True)
+        # write to a per-process sibling and move it into place, so that concurrent xdist workers never read a partial file
+        tmp_cache_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        tmp_cache_file.write_text(json.dumps({"contents": contents, "tmp_in": tmp_in}), encoding="utf-8")
+        os.replace(tmp_cache_file, cache_file)
+    
+    return (*[_load_output(c, l) for c, l in zip(contents, langs)], tmp_in)
+
+
+def _ctypesgen_main_multi(all_cmdargs):
+    # equivalent to calling ctypesgen_main() for each of the given command lines, assuming they only differ in output language and path
+    # pre-processing and parsing is done only once, but processing is partly language-specific, so each printer gets a fresh copy of the parsed data
+    raw_data = None
+    for cmdargs in all_cmdargs:
+        cmdargs = [str(a) for a in cmdargs]
+        cmd_str = ctypesgen.__main__.get_cmd_str(cmdargs)
+        print(cmd_str, file=sys.stderr)
+        ctypesgen.__main__.get_priv_paths.cache_clear()
+        args = ctypesgen.__main__.get_parser().parse_args(cmdargs)
+        ctypesgen.__main__.postparse(args)
+        ctypesgen.__main__.prepare_args(args)
+        if raw_data is None:
+            raw_data = ctypesgen.parser.parse(args.headers, args)
+        ctypesgen.__main__.process_and_print(copy.deepcopy(raw_data), args, cmd_str)
 
 
 def generate_common():
@@ -130,9 +212,8 @@ void bar(struct mystruct *m) { }
 
 
 def _compile_common(common_lib):
-    subprocess.run(["gcc", "-c", COMMON_DIR/"a.c", "-o", COMMON_DIR/"a.o"])
-    subprocess.run(["gcc", "-c", COMMON_DIR/"b.c", "-o", COMMON_DIR/"b.o"])
-    subprocess.run(["gcc", "-shared", "-o", COMMON_DIR/common_lib, COMMON_DIR/"a.o", COMMON_DIR/"b.o"])
+    # compile and link in one go, rather than spawning gcc for each object file
+    subprocess.run(["gcc", "-shared", "-o", COMMON_DIR/common_lib, COMMON_DIR/"a.c", COMMON_DIR/"b.c"], check=True)
 
 
 def _generate_with_common(file_name, shared):
@@ -1,5 +1,7 @@
 import sys
 import json as JSON
+from types import MappingProxyType
+from collections.abc import Mapping
 
 
 class JsonHelper:
@@ -72,9 +74,35 @@ class JsonHelper:
                     self._search_anon_tags(value)
 
 
+def find_mismatch(json, json_ans, path=""):
+    """
+    Locates the first difference between two JSON structures, in document order.
+    Returns a (path, generated, stored) tuple, or None if the structures are equal.
+    This avoids assertEqual()'s diff of the whole (possibly very large) structure.
+    """
+    stack = [(path, json, json_ans)]
+    while stack:
+        path, gen, ans = stack.pop()
+        if isinstance(gen, list) and isinstance(ans, list):
+            if len(gen) != len(ans):
+                return f"{path} (length)", len(gen), len(ans)
+            stack.extend((f"{path}[{n}]", g, a) for n, (g, a) in reversed(list(enumerate(zip(gen, ans)))))
+        elif isinstance(gen, Mapping) and isinstance(ans, Mapping):
+            if gen.keys() != ans.keys():
+                return f"{path} (keys)", sorted(gen.keys()), sorted(ans.keys())
+            stack.extend((f"{path}.{k}", gen[k], ans[k]) for k in reversed(list(gen.keys())))
+        elif gen != ans:
+            return path, gen, ans
+    return None
+
+
 def compare_json(test_instance, json, json_ans, verbose=False):
     json_helper = JsonHelper()
     json_helper.prepare(json)
+    
+    # fast path: a single (C-level) comparison of the whole structure, only walk the entries for diagnostics on mismatch
+    if json == json_ans:
+        return
 
     print_excess = False
     try:
@@ -93,16 +121,18 @@ def compare_json(test_instance, json, json_ans, verbose=False):
             raise
 
     # first fix paths that exist inside JSON to avoid user-specific paths:
-    for i, ith_json_ans in zip(json, json_ans):
-        try:
-            test_instance.assertEqual(i, ith_json_ans)
-        except Exception:
+    for n, (i, ith_json_ans) in enumerate(zip(json, json_ans)):
+        mismatch = find_mismatch(i, ith_json_ans, path=f"[{n}]")
+        if mismatch:
             if verbose:
+                # serialize each side only once, this can be large for nested structs
+                gen_str = JSON.dumps(i, indent=4)
+                ans_str = JSON.dumps(ith_json_ans, indent=4, default=dict)
                 print("\nFailed JSON for: ", i["name"])
-                print("GENERATED:\n", i, "\nANS:\n", ith_json_ans)
-                print("FAILED FOR================", JSON.dumps(i, indent=4))
-                print("GENERATED =============", JSON.dumps(ith_json_ans, indent=4))
-            raise
+                print("GENERATED =============\n", gen_str)
+                print("STORED ================\n", ans_str)
+            path, gen_value, ans_value = mismatch
+            test_instance.fail(f"JSON mismatch at {path}: {gen_value!r} (generated) != {ans_value!r} (stored)")
 
     if print_excess:
         if len(json) > len(json_ans):
@@ -113,1342 +143,246 @@ def compare_json(test_instance, json, json_ans, verbose=False):
 
         print("Excess JSON content from", jlabel, "content:")
         pprint.pprint(j[jlen:])
+    
+    # the fast path failed, so this must not pass even if no entry-level mismatch was found
+    test_instance.fail(f"JSON mismatch: {len(json)} (generated) vs {len(json_ans)} (stored) entries" if print_excess else "JSON mismatch")
 
 
-def get_ans_struct(tmp_header_path):
-    return [
-        {
-            "attrib": {},
-            "fields": [
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "a",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "char",
-                        "signed": True,
-                    },
-                    "name": "b",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "c",
-                },
-                {
-                    "bitfield": "15",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 15,
-                        },
-                        "errors": [],
-                    },
-                    "name": "d",
-                },
-                {
-                    "bitfield": "17",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 17,
-                        },
-                        "errors": [],
-                    },
-                    "name": None,
-                },
-            ],
-            "name": "foo",
-            "type": "struct",
-        },
-        {
-            "attrib": {"packed": True},
-            "fields": [
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "a",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "char",
-                        "signed": True,
-                    },
-                    "name": "b",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "c",
-                },
-                {
-                    "bitfield": "15",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 15,
-                        },
-                        "errors": [],
-                    },
-                    "name": "d",
-                },
-                {
-                    "bitfield": "17",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 17,
-                        },
-                        "errors": [],
-                    },
-                    "name": None,
-                },
-            ],
-            "name": "packed_foo",
-            "type": "struct",
-        },
-        {
-            "attrib": {},
-            "fields": [
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "a",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "char",
-                        "signed": True,
-                    },
-                    "name": "b",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "c",
-                },
-                {
-                    "bitfield": "15",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 15,
-                        },
-                        "errors": [],
-                    },
-                    "name": "d",
-                },
-                {
-                    "bitfield": "17",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 17,
-                        },
-                        "errors": [],
-                    },
-                    "name": None,
-                },
-            ],
-            "name": "anon_1",
-            "type": "struct",
-        },
-        {
-            "ctype": {
-                "Klass": "CtypesStruct",
-                "anonymous": True,
-                "errors": [],
-                "members": [
-                    [
-                        "a",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "b",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "char",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "c",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "d",
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 15,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                    [
-                        None,
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 17,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                ],
-                "opaque": False,
-                "attrib": {},
-                "src": [tmp_header_path, None],
-                "tag": "anon_1",
-                "variety": "struct",
-            },
-            "name": "foo_t",
-            "type": "typedef",
-        },
-        {
-            "attrib": {"packed": True},
-            "fields": [
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "a",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "char",
-                        "signed": True,
-                    },
-                    "name": "b",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "c",
-                },
-                {
-                    "bitfield": "15",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 15,
-                        },
-                        "errors": [],
-                    },
-                    "name": "d",
-                },
-                {
-                    "bitfield": "17",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 17,
-                        },
-                        "errors": [],
-                    },
-                    "name": None,
-                },
-            ],
-            "name": "anon_2",
-            "type": "struct",
-        },
-        {
-            "ctype": {
-                "Klass": "CtypesStruct",
-                "anonymous": True,
-                "errors": [],
-                "members": [
-                    [
-                        "a",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "b",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "char",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "c",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "d",
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 15,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                    [
-                        None,
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 17,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                ],
-                "opaque": False,
-                "attrib": {"packed": True},
-                "src": [tmp_header_path, None],
-                "tag": "anon_2",
-                "variety": "struct",
-            },
-            "name": "packed_foo_t",
-            "type": "typedef",
-        },
-        {
-            "attrib": {"packed": True, "aligned": [4]},
-            "fields": [
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "a",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "char",
-                        "signed": True,
-                    },
-                    "name": "b",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "c",
-                },
-                {
-                    "bitfield": "15",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 15,
-                        },
-                        "errors": [],
-                    },
-                    "name": "d",
-                },
-                {
-                    "bitfield": "17",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 17,
-                        },
-                        "errors": [],
-                    },
-                    "name": None,
-                },
-            ],
-            "name": "anon_3",
-            "type": "struct",
-        },
-        {
-            "ctype": {
-                "Klass": "CtypesStruct",
-                "anonymous": True,
-                "errors": [],
-                "members": [
-                    [
-                        "a",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "b",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "char",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "c",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "d",
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 15,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                    [
-                        None,
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 17,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                ],
-                "opaque": False,
-                "attrib": {"packed": True, "aligned": [4]},
-                "src": [tmp_header_path, None],
-                "tag": "anon_3",
-                "variety": "struct",
-            },
-            "name": "pragma_packed_foo_t",
-            "type": "typedef",
-        },
-        {
-            "attrib": {"packed": True, "aligned": [2]},
-            "fields": [
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "a",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "char",
-                        "signed": True,
-                    },
-                    "name": "b",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "c",
-                },
-                {
-                    "bitfield": "15",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 15,
-                        },
-                        "errors": [],
-                    },
-                    "name": "d",
-                },
-                {
-                    "bitfield": "17",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 17,
-                        },
-                        "errors": [],
-                    },
-                    "name": None,
-                },
-            ],
-            "name": "pragma_packed_foo2",
-            "type": "struct",
-        },
-        {
-            "attrib": {},
-            "fields": [
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "a",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "char",
-                        "signed": True,
-                    },
-                    "name": "b",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "c",
-                },
-                {
-                    "bitfield": "15",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 15,
-                        },
-                        "errors": [],
-                    },
-                    "name": "d",
-                },
-                {
-                    "bitfield": "17",
-                    "ctype": {
-                        "Klass": "CtypesBitfield",
-                        "base": {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                        "bitfield": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 17,
-                        },
-                        "errors": [],
-                    },
-                    "name": None,
-                },
-            ],
-            "name": "foo3",
-            "type": "struct",
-        },
-        {
-            "ctype": {
-                "Klass": "CtypesSimple",
-                "errors": [],
-                "longs": 0,
-                "name": "int",
-                "signed": True,
-            },
-            "name": "Int",
-            "type": "typedef",
+# Frequently repeated sub-structures, shared as read-only instances.
+# Mapping proxies compare equal to the plain dicts of the generated JSON, but need default=dict for serialization.
+
+def _ctypes_simple(name):
+    return MappingProxyType({"Klass": "CtypesSimple", "errors": [], "longs": 0, "name": name, "signed": True})
+
+_INT_T = _ctypes_simple("int")
+_CHAR_T = _ctypes_simple("char")
+_VOID_T = _ctypes_simple("void")
+
+def _constant_node(value):
+    return MappingProxyType({"Klass": "ConstantExpressionNode", "errors": [], "is_literal": False, "value": value})
+
+def _ctypes_bitfield(width):
+    return MappingProxyType({
+        "Klass": "CtypesBitfield",
+        "base": _INT_T,
+        "bitfield": _constant_node(width),
+        "errors": [],
+    })
+
+_BITFIELD_15 = _ctypes_bitfield(15)
+_BITFIELD_17 = _ctypes_bitfield(17)
+
+
+# The expected answers are built once at import time. The path of the temporary header varies per run, so it is filled in on request.
+# To avoid rebuilding or copying the whole answer, the "src" entries referring to the header are located once, and patched in place.
+
+HEADER_PATH = "<tmp_header_path>"
+
+def find_src_sites(json):
+    """Returns (mapping, rest of "src" entry) tuples for all "src" entries that refer to the header path placeholder"""
+    sites = []
+    stack = [json]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, Mapping):
+            src = item.get("src")
+            if isinstance(src, list) and src and src[0] == HEADER_PATH:
+                sites.append((item, src[1:]))
+            stack.extend(item.values())
+    return sites
+
+def fill_header_path(json, sites, tmp_header_path):
+    """Patches the given path into the "src" sites of json, and returns json itself (not a copy).
+    The result is only valid until the next call for the same answer, which overwrites the path in place."""
+    for site, rest in sites:
+        site["src"] = [tmp_header_path, *rest]
+    return json
+
+
+# The structures test header declares several variants of the same struct, which only differ in name, tag and attributes.
+
+def _foo_struct(name, attrib):
+    return {
+        "attrib": attrib,
+        "fields": [
+            {"ctype": _INT_T, "name": "a"},
+            {"ctype": _CHAR_T, "name": "b"},
+            {"ctype": _INT_T, "name": "c"},
+            {"bitfield": "15", "ctype": _BITFIELD_15, "name": "d"},
+            {"bitfield": "17", "ctype": _BITFIELD_17, "name": None},
+        ],
+        "name": name,
+        "type": "struct",
+    }
+
+def _foo_typedef(name, attrib, anon_tag=None):
+    return {
+        "ctype": {
+            "Klass": "CtypesStruct",
+            "anonymous": anon_tag is not None,
+            "attrib": attrib,
+            "errors": [],
+            "members": [["a", _INT_T], ["b", _CHAR_T], ["c", _INT_T], ["d", _BITFIELD_15], [None, _BITFIELD_17]],
+            "opaque": False,
+            "src": [HEADER_PATH, None],
+            "tag": anon_tag or name,
+            "variety": "struct",
         },
-        {
-            "attrib": {},
-            "fields": [
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "Int",
-                }
+        "name": name,
+        "type": "typedef",
+    }
+
+
+# the anonymous struct behind the BAR0 typedef, also referenced as pointer destination by PBAR0
+
+def _bar_ctype():
+    return {
+        "Klass": "CtypesStruct",
+        "anonymous": True,
+        "attrib": {},
+        "errors": [],
+        "members": [["a", _INT_T], ["b", _CHAR_T]],
+        "opaque": False,
+        "src": [HEADER_PATH, None],
+        "tag": "anon_5",
+        "variety": "struct",
+    }
+
+
+_ANS_STRUCT = [
+    _foo_struct("foo", {}),
+    _foo_struct("packed_foo", {"packed": True}),
+    _foo_struct("anon_1", {}),
+    _foo_typedef("foo_t", {}, anon_tag="anon_1"),
+    _foo_struct("anon_2", {"packed": True}),
+    _foo_typedef("packed_foo_t", {"packed": True}, anon_tag="anon_2"),
+    _foo_struct("anon_3", {"packed": True, "aligned": [4]}),
+    _foo_typedef("pragma_packed_foo_t", {"packed": True, "aligned": [4]}, anon_tag="anon_3"),
+    _foo_struct("pragma_packed_foo2", {"packed": True, "aligned": [2]}),
+    _foo_struct("foo3", {}),
+    {
+        "ctype": _INT_T,
+        "name": "Int",
+        "type": "typedef",
+    },
+    {
+        "attrib": {},
+        "fields": [
+            {
+                "ctype": _INT_T,
+                "name": "Int",
+            }
+        ],
+        "name": "anon_4",
+        "type": "struct",
+    },
+    {
+        "ctype": {
+            "Klass": "CtypesStruct",
+            "anonymous": True,
+            "errors": [],
+            "members": [
+                [
+                    "Int",
+                    _INT_T,
+                ]
             ],
-            "name": "anon_4",
-            "type": "struct",
-        },
-        {
-            "ctype": {
-                "Klass": "CtypesStruct",
-                "anonymous": True,
-                "errors": [],
-                "members": [
-                    [
-                        "Int",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ]
-                ],
-                "opaque": False,
-                "attrib": {},
-                "src": [tmp_header_path, None],
-                "tag": "anon_4",
-                "variety": "struct",
-            },
-            "name": "id_struct_t",
-            "type": "typedef",
-        },
-        {
+            "opaque": False,
             "attrib": {},
-            "fields": [
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "int",
-                        "signed": True,
-                    },
-                    "name": "a",
-                },
-                {
-                    "ctype": {
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "char",
-                        "signed": True,
-                    },
-                    "name": "b",
-                },
-            ],
-            "name": "anon_5",
-            "type": "struct",
+            "src": [HEADER_PATH, None],
+            "tag": "anon_4",
+            "variety": "struct",
         },
-        {
-            "ctype": {
-                "Klass": "CtypesStruct",
-                "anonymous": True,
-                "attrib": {},
-                "errors": [],
-                "members": [
-                    [
-                        "a",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "b",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "char",
-                            "signed": True,
-                        },
-                    ],
-                ],
-                "opaque": False,
-                "src": [tmp_header_path, None],
-                "tag": "anon_5",
-                "variety": "struct",
+        "name": "id_struct_t",
+        "type": "typedef",
+    },
+    {
+        "attrib": {},
+        "fields": [
+            {
+                "ctype": _INT_T,
+                "name": "a",
             },
-            "name": "BAR0",
-            "type": "typedef",
-        },
-        {
-            "ctype": {
-                "Klass": "CtypesPointer",
-                "destination": {
-                    "Klass": "CtypesStruct",
-                    "anonymous": True,
-                    "attrib": {},
-                    "errors": [],
-                    "members": [
-                        [
-                            "a",
-                            {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                        ],
-                        [
-                            "b",
-                            {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "char",
-                                "signed": True,
-                            },
-                        ],
-                    ],
-                    "opaque": False,
-                    "src": [tmp_header_path, None],
-                    "tag": "anon_5",
-                    "variety": "struct",
-                },
-                "errors": [],
-                "qualifiers": [],
+            {
+                "ctype": _CHAR_T,
+                "name": "b",
             },
-            "name": "PBAR0",
-            "type": "typedef",
+        ],
+        "name": "anon_5",
+        "type": "struct",
+    },
+    {
+        "ctype": _bar_ctype(),
+        "name": "BAR0",
+        "type": "typedef",
+    },
+    {
+        "ctype": {
+            "Klass": "CtypesPointer",
+            "destination": _bar_ctype(),
+            "errors": [],
+            "qualifiers": [],
         },
-        {
-            "ctype": {
-                "Klass": "CtypesStruct",
-                "anonymous": False,
-                "errors": [],
-                "members": [
-                    [
-                        "a",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "b",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "char",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "c",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "d",
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 15,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                    [
-                        None,
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 17,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                ],
-                "opaque": False,
-                "attrib": {},
-                "src": [tmp_header_path, None],
-                "tag": "foo",
-                "variety": "struct",
-            },
-            "name": "foo",
-            "type": "typedef",
-        },
-        {
-            "ctype": {
-                "Klass": "CtypesStruct",
-                "anonymous": False,
-                "errors": [],
-                "members": [
-                    [
-                        "a",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "b",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "char",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "c",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "d",
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 15,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                    [
-                        None,
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 17,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                ],
-                "opaque": False,
-                "attrib": {"packed": True},
-                "src": [tmp_header_path, None],
-                "tag": "packed_foo",
-                "variety": "struct",
-            },
-            "name": "packed_foo",
-            "type": "typedef",
-        },
-        {
-            "ctype": {
-                "Klass": "CtypesStruct",
-                "anonymous": False,
-                "attrib": {"aligned": [2], "packed": True},
-                "errors": [],
-                "members": [
-                    [
-                        "a",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "b",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "char",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "c",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "d",
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 15,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                    [
-                        None,
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 17,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                ],
-                "opaque": False,
-                "src": [tmp_header_path, None],
-                "tag": "pragma_packed_foo2",
-                "variety": "struct",
-            },
-            "name": "pragma_packed_foo2",
-            "type": "typedef",
-        },
-        {
-            "ctype": {
-                "Klass": "CtypesStruct",
-                "anonymous": False,
-                "attrib": {},
-                "errors": [],
-                "members": [
-                    [
-                        "a",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "b",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "char",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "c",
-                        {
-                            "Klass": "CtypesSimple",
-                            "errors": [],
-                            "longs": 0,
-                            "name": "int",
-                            "signed": True,
-                        },
-                    ],
-                    [
-                        "d",
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 15,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                    [
-                        None,
-                        {
-                            "Klass": "CtypesBitfield",
-                            "base": {
-                                "Klass": "CtypesSimple",
-                                "errors": [],
-                                "longs": 0,
-                                "name": "int",
-                                "signed": True,
-                            },
-                            "bitfield": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 17,
-                            },
-                            "errors": [],
-                        },
-                    ],
-                ],
-                "opaque": False,
-                "src": [tmp_header_path, None],
-                "tag": "foo3",
-                "variety": "struct",
-            },
-            "name": "foo3",
-            "type": "typedef",
-        },
-    ]
+        "name": "PBAR0",
+        "type": "typedef",
+    },
+    _foo_typedef("foo", {}),
+    _foo_typedef("packed_foo", {"packed": True}),
+    _foo_typedef("pragma_packed_foo2", {"aligned": [2], "packed": True}),
+    _foo_typedef("foo3", {}),
+]
+_ANS_STRUCT_SITES = find_src_sites(_ANS_STRUCT)
 
 
+def get_ans_struct(tmp_header_path):
+    """The returned answer is shared and only valid until the next call, see fill_header_path()"""
+    return fill_header_path(_ANS_STRUCT, _ANS_STRUCT_SITES, tmp_header_path)
 
-def get_ans_enum(tmp_header_path):
-    return [
-        {
-            "fields": [
-                {
-                    "ctype": {
-                        "Klass": "ConstantExpressionNode",
+
+
+_ANS_ENUM = [
+    {
+        "fields": [
+            {
+                "ctype": _constant_node(0),
+                "name": "TEST_1",
+            },
+            {
+                "ctype": {
+                    "Klass": "BinaryExpressionNode",
+                    "can_be_ctype": [False, False],
+                    "errors": [],
+                    "format": "(%s + %s)",
+                    "left": {
+                        "Klass": "IdentifierExpressionNode",
                         "errors": [],
-                        "is_literal": False,
-                        "value": 0,
+                        "name": "TEST_1",
                     },
-                    "name": "TEST_1",
+                    "name": "addition",
+                    "right": _constant_node(1),
                 },
-                {
-                    "ctype": {
+                "name": "TEST_2",
+            },
+        ],
+        "name": "anon_1",
+        "type": "enum",
+    },
+    {"name": "TEST_1", "type": "constant", "value": "0"},
+    {"name": "TEST_2", "type": "constant", "value": "(TEST_1 + 1)"},
+    {
+        "ctype": {
+            "Klass": "CtypesEnum",
+            "anonymous": True,
+            "enumerators": [
+                [
+                    "TEST_1",
+                    _constant_node(0),
+                ],
+                [
+                    "TEST_2",
+                    {
                         "Klass": "BinaryExpressionNode",
                         "can_be_ctype": [False, False],
                         "errors": [],
@@ -1459,152 +393,103 @@ def get_ans_enum(tmp_header_path):
                             "name": "TEST_1",
                         },
                         "name": "addition",
-                        "right": {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 1,
-                        },
+                        "right": _constant_node(1),
                     },
-                    "name": "TEST_2",
-                },
-            ],
-            "name": "anon_1",
-            "type": "enum",
-        },
-        {"name": "TEST_1", "type": "constant", "value": "0"},
-        {"name": "TEST_2", "type": "constant", "value": "(TEST_1 + 1)"},
-        {
-            "ctype": {
-                "Klass": "CtypesEnum",
-                "anonymous": True,
-                "enumerators": [
-                    [
-                        "TEST_1",
-                        {
-                            "Klass": "ConstantExpressionNode",
-                            "errors": [],
-                            "is_literal": False,
-                            "value": 0,
-                        },
-                    ],
-                    [
-                        "TEST_2",
-                        {
-                            "Klass": "BinaryExpressionNode",
-                            "can_be_ctype": [False, False],
-                            "errors": [],
-                            "format": "(%s + %s)",
-                            "left": {
-                                "Klass": "IdentifierExpressionNode",
-                                "errors": [],
-                                "name": "TEST_1",
-                            },
-                            "name": "addition",
-                            "right": {
-                                "Klass": "ConstantExpressionNode",
-                                "errors": [],
-                                "is_literal": False,
-                                "value": 1,
-                            },
-                        },
-                    ],
                 ],
-                "errors": [],
-                "opaque": False,
-                "src": [tmp_header_path, None],
-                "tag": "anon_1",
-            },
-            "name": "test_status_t",
-            "type": "typedef",
+            ],
+            "errors": [],
+            "opaque": False,
+            "src": [HEADER_PATH, None],
+            "tag": "anon_1",
         },
-    ]
+        "name": "test_status_t",
+        "type": "typedef",
+    },
+]
+_ANS_ENUM_SITES = find_src_sites(_ANS_ENUM)
 
 
+def get_ans_enum(tmp_header_path):
+    """The returned answer is shared and only valid until the next call, see fill_header_path()"""
+    return fill_header_path(_ANS_ENUM, _ANS_ENUM_SITES, tmp_header_path)
 
-def get_ans_function_prototypes():
-    return [
-        {
-            "args": [
-                {
-                    "Klass": "CtypesSimple",
-                    "errors": [],
-                    "identifier": "a",
-                    "longs": 0,
-                    "name": "int",
-                    "signed": True,
-                }
-            ],
-            "attrib": {},
-            "name": "bar2",
-            "return": {
+
+
+_ANS_FUNCTION_PROTOTYPES = [
+    {
+        "args": [
+            {
                 "Klass": "CtypesSimple",
                 "errors": [],
+                "identifier": "a",
                 "longs": 0,
                 "name": "int",
                 "signed": True,
-            },
-            "type": "function",
-            "variadic": False,
-        },
-        {
-            "args": [
-                {
-                    "Klass": "CtypesSimple",
-                    "errors": [],
-                    "identifier": "",
-                    "longs": 0,
-                    "name": "int",
-                    "signed": True,
-                }
-            ],
-            "attrib": {},
-            "name": "bar",
-            "return": {
+            }
+        ],
+        "attrib": {},
+        "name": "bar2",
+        "return": _INT_T,
+        "type": "function",
+        "variadic": False,
+    },
+    {
+        "args": [
+            {
                 "Klass": "CtypesSimple",
                 "errors": [],
+                "identifier": "",
                 "longs": 0,
                 "name": "int",
                 "signed": True,
-            },
-            "type": "function",
-            "variadic": False,
-        },
-        {
-            "args": [],
-            "attrib": {},
-            "name": "foo",
-            "return": {
-                "Klass": "CtypesSimple",
-                "errors": [],
-                "longs": 0,
-                "name": "void",
-                "signed": True,
-            },
-            "type": "function",
-            "variadic": False,
+            }
+        ],
+        "attrib": {},
+        "name": "bar",
+        "return": _INT_T,
+        "type": "function",
+        "variadic": False,
+    },
+    {
+        "args": [],
+        "attrib": {},
+        "name": "foo",
+        "return": _VOID_T,
+        "type": "function",
+        "variadic": False,
+    },
+    {
+        "args": [],
+        "attrib": {"stdcall": True},
+        "name": "foo2",
+        "return": _VOID_T,
+        "type": "function",
+        "variadic": False,
+    },
+    {
+        "args": [],
+        "attrib": {"stdcall": True},
+        "name": "foo3",
+        "return": {
+            "Klass": "CtypesPointer",
+            "destination": _VOID_T,
+            "errors": [],
+            "qualifiers": [],
         },
-        {
-            "args": [],
-            "attrib": {"stdcall": True},
-            "name": "foo2",
-            "return": {
-                "Klass": "CtypesSimple",
-                "errors": [],
-                "longs": 0,
-                "name": "void",
-                "signed": True,
-            },
-            "type": "function",
-            "variadic": False,
-        },
-        {
-            "args": [],
-            "attrib": {"stdcall": True},
-            "name": "foo3",
-            "return": {
+        "type": "function",
+        "variadic": False,
+    },
+    {
+        "args": [],
+        "attrib": {"stdcall": True},
+        "name": "foo4",
+        "return": {
+            "Klass": "CtypesPointer",
+            "destination": {
                 "Klass": "CtypesPointer",
                 "destination": {
+                    # this return type seems like it really ought to be
+                    # the same as for foo3
                     "Klass": "CtypesSimple",
                     "errors": [],
                     "longs": 0,
@@ -1614,47 +499,22 @@ def get_ans_function_prototypes():
                 "errors": [],
                 "qualifiers": [],
             },
-            "type": "function",
-            "variadic": False,
+            "errors": [],
+            "qualifiers": [],
         },
-        {
-            "args": [],
-            "attrib": {"stdcall": True},
-            "name": "foo4",
-            "return": {
-                "Klass": "CtypesPointer",
-                "destination": {
-                    "Klass": "CtypesPointer",
-                    "destination": {
-                        # this return type seems like it really ought to be
-                        # the same as for foo3
-                        "Klass": "CtypesSimple",
-                        "errors": [],
-                        "longs": 0,
-                        "name": "void",
-                        "signed": True,
-                    },
-                    "errors": [],
-                    "qualifiers": [],
-                },
-                "errors": [],
-                "qualifiers": [],
-            },
-            "type": "function",
-            "variadic": False,
-        },
-        {
-            "args": [],
-            "attrib": {"stdcall": True},
-            "name": "foo5",
-            "return": {
-                "Klass": "CtypesSimple",
-                "errors": [],
-                "longs": 0,
-                "name": "void",
-                "signed": True,
-            },
-            "type": "function",
-            "variadic": False,
-        },
-    ]
+        "type": "function",
+        "variadic": False,
+    },
+    {
+        "args": [],
+        "attrib": {"stdcall": True},
+        "name": "foo5",
+        "return": _VOID_T,
+        "type": "function",
+        "variadic": False,
+    },
+]
+
+
+def get_ans_function_prototypes():
+    return _ANS_FUNCTION_PROTOTYPES
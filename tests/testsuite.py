@@ -13,12 +13,16 @@ Calling a specific test only:
 or
     pytest -v  --showlocals tests/testsuite.py
     pytest -v  --showlocals tests/testsuite.py::StdBoolTest::test_stdbool_type
+Running in parallel (requires pytest-xdist):
+    pytest -n auto tests/testsuite.py
 
 Could use any unitest compatible test runner (nose, etc.)
 
 Note, you may set CLEANUP_OK=0 to retain generated data. This can be useful for inspection.
 Further, the test session's C pre-processor may be configured via the CPP env var:
 e.g. CPP="clang -E"
+During development, CTYPESGEN_TEST_CACHE=1 may be set to cache generated outputs on disk across test runs.
+The cache is keyed by the ctypesgen sources and the generate() arguments. Calls with linked modules or local includes are not cached, but changes to system headers are not detected.
 """
 
 import io
@@ -26,7 +30,10 @@ import sys
 import os
 import ctypes
 import shutil
+import importlib
 import math
+import operator
+import functools
 import unittest
 from contextlib import (
     redirect_stdout,
@@ -34,13 +41,18 @@ from contextlib import (
 )
 
 from ctypesgen import VERSION
+from ctypesgen.__main__ import api_main, tmp_searchpath
 from ctypesgen.processor.operations import free_library
 from .conftest import (
     cleanup_common,
     generate,
+    generate_multi,
     generate_common,
     ctypesgen_main,
+    module_from_code,
+    get_file_id,
     TMP_DIR,
+    COMMON_DIR,
     CLEANUP_OK,
 )
 from . import json_expects
@@ -59,6 +71,10 @@ else:
     MATHLIB_NAME = STDLIB_NAME
 
 
+# symbol rule to take over reserved (double underscore) names from system headers only where needed
+IF_NEEDED_PRIVATE = r"if_needed=__\w+"
+
+
 class TestCaseWithCleanup(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
@@ -69,7 +85,7 @@ class StdlibTest(TestCaseWithCleanup):
     
     @classmethod
     def setUpClass(cls):
-        cls.module = generate(header=None, args=["--system-headers", "stdlib.h", "-l", STDLIB_NAME, "--symbol-rules", r"if_needed=__\w+"])
+        cls.module = generate(header=None, args=["--system-headers", "stdlib.h", "-l", STDLIB_NAME, "--symbol-rules", IF_NEEDED_PRIVATE], name=cls.__name__)
 
     def test_getenv_returns_string(self):
         """ Test string return """
@@ -86,32 +102,47 @@ class StdlibTest(TestCaseWithCleanup):
             # "Potential Errors Passing CRT Objects Across DLL Boundaries"
         else:
             env_var_name = "HELLO"
-            os.environ[env_var_name] = "WORLD"  # This doesn't work under win32
             expect_result = "WORLD"
+            if os.environ.get(env_var_name) != expect_result:
+                os.environ[env_var_name] = expect_result  # This doesn't work under win32
 
-        result_ptr = self.module.getenv(env_var_name.encode("utf-8"))
-        result = ctypes.cast(result_ptr, ctypes.c_char_p).value.decode("utf-8")
-        self.assertEqual(expect_result, result)
+        result_ptr = self.module.getenv(env_var_name.encode())
+        result = ctypes.cast(result_ptr, ctypes.c_char_p).value
+        self.assertEqual(expect_result.encode(), result)
 
     def test_getenv_returns_null(self):
         """Related to issue 8. Test getenv of unset variable."""
         env_var_name = "NOT SET"
-        try:
-            # ensure variable is not set, ignoring not set errors
-            del os.environ[env_var_name]
-        except KeyError:
-            pass
-        result_ptr = self.module.getenv(env_var_name.encode("utf-8"))
+        os.environ.pop(env_var_name, None)  # ensure variable is not set
+        result_ptr = self.module.getenv(env_var_name.encode())
         result = ctypes.cast(result_ptr, ctypes.c_char_p).value
         self.assertEqual(result, None)
 
 
+class MissingSymbolTest(TestCaseWithCleanup):
+    """Test that guarded bindings of symbols absent from the runtime library are skipped on import"""
+
+    @classmethod
+    def setUpClass(cls):
+        header_str = """
+int abs(int x);
+int ctypesgen_missing_function(int x);
+"""
+        cls.module = generate(header_str, ["-l", STDLIB_NAME], name=cls.__name__)
+
+    def test_present(self):
+        self.assertEqual(self.module.abs(-3), 3)
+
+    def test_missing(self):
+        self.assertFalse(hasattr(self.module, "ctypesgen_missing_function"))
+
+
 class VariadicFunctionTest(TestCaseWithCleanup):
     """ This tests calling variadic functions. """
     
     @classmethod
     def setUpClass(cls):
-        cls.module = generate(header=None, args=["--system-headers", "stdio.h", "-l", STDLIB_NAME, "--symbol-rules", r"if_needed=__\w+"])
+        cls.module = generate(header=None, args=["--system-headers", "stdio.h", "-l", STDLIB_NAME, "--symbol-rules", IF_NEEDED_PRIVATE], name=cls.__name__)
     
     def test_type_error_catch(self):
         with self.assertRaises(ctypes.ArgumentError):
@@ -140,7 +171,7 @@ class MathTest(TestCaseWithCleanup):
 """
         # math.h contains a macro NAN = (0.0 / 0.0) which triggers a ZeroDivisionError on module import, so exclude the symbol.
         # TODO consider adding option like --replace-symbol NAN=float("nan")
-        cls.module = generate(header_str, ["-l", MATHLIB_NAME, "--all-headers", "--symbol-rules", "never=NAN", r"if_needed=__\w+"])
+        cls.module = generate(header_str, ["-l", MATHLIB_NAME, "--all-headers", "--symbol-rules", "never=NAN", IF_NEEDED_PRIVATE], name=cls.__name__)
 
     def test_sin(self):
         self.assertEqual(self.module.sin(2), math.sin(2))
@@ -168,10 +199,15 @@ class CommonHeaderTest(unittest.TestCase):
         cleanup_common()
     
     # NOTE `common` is a meta-module hosted by the test class, and {a,b}_{shared,unshared} are the actual python files in question
+    # the package name depends on the xdist worker (see conftest), so import dynamically
+    
+    @staticmethod
+    def _import(name):
+        return importlib.import_module(f".{COMMON_DIR.name}.{name}", __package__)
     
     def test_unshared(self):
-        from .common import a_unshared as a
-        from .common import b_unshared as b
+        a = self._import("a_unshared")
+        b = self._import("b_unshared")
         
         try:
             self.assertFalse(a.mystruct is b.mystruct)
@@ -185,10 +221,10 @@ class CommonHeaderTest(unittest.TestCase):
             free_library(b._libs["common"]._handle)
     
     def test_shared_interop(self):
-        from .common import common
-        from .common import a_shared as a
-        from .common import b_shared as b
-        from .common import _ctg_loader as common_loader
+        common = self._import("common")
+        a = self._import("a_shared")
+        b = self._import("b_shared")
+        common_loader = self._import("_ctg_loader")
         
         try:
             self.assertTrue(common.mystruct is a.mystruct is b.mystruct)
@@ -200,12 +236,49 @@ class CommonHeaderTest(unittest.TestCase):
             free_library(common_loader._libs["common"]._handle)
 
 
-class StdBoolTest(TestCaseWithCleanup):
-    """Test correct parsing and generation of bool type"""
+class LinkedModuleAllTest(TestCaseWithCleanup):
+    """Test that a linked module's __all__ determines which names are taken from it"""
 
     @classmethod
     def setUpClass(cls):
         header_str = """
+#define EXPORTED 1
+#define UNLISTED 2
+#define _PRIVATE 3
+"""
+        cls.modname = f"linked_{get_file_id(cls.__name__)}"
+        (TMP_DIR/f"{cls.modname}.py").write_text('__all__ = ["EXPORTED", "_PRIVATE"]\nEXPORTED = 10\nUNLISTED = 20\n_PRIVATE = 30\n')
+        with tmp_searchpath(TMP_DIR):
+            cls.module = generate(header_str, ["-m", cls.modname], name=cls.__name__)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        sys.modules.pop(cls.modname, None)
+
+    def test_listed(self):
+        """Names in __all__ are linked, including underscore names, so the header's macros are renamed"""
+        self.assertEqual((self.module.EXPORTED, self.module.EXPORTED_), (10, 1))
+        self.assertEqual((self.module._PRIVATE, self.module._PRIVATE_), (30, 3))
+
+    def test_unlisted(self):
+        """Names missing from __all__ are not linked, so the header's macro keeps its name"""
+        self.assertEqual(self.module.UNLISTED, 2)
+        self.assertFalse(hasattr(self.module, "UNLISTED_"))
+
+
+@functools.lru_cache(maxsize=1)
+def generate_combined():
+    # the headers of these test cases are small and don't share symbols, so process them in a single run
+    classes = (StdBoolTest, IntTypesTest, SimpleMacrosTest)
+    header_str = "\n".join(c.HEADER for c in classes)
+    return generate_multi(header_str, name="_".join(c.__name__ for c in classes))
+
+
+class StdBoolTest(TestCaseWithCleanup):
+    """Test correct parsing and generation of bool type"""
+
+    HEADER = """
 #include <stdbool.h>
 
 struct foo {
@@ -213,7 +286,10 @@ struct foo {
     int a;
 };
 """
-        cls.module = generate(header_str)  # ["--all-headers"]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.module, _, _ = generate_combined()  # ["--all-headers"]
 
     def test_stdbool_type(self):
         """Test if bool is parsed correctly"""
@@ -224,9 +300,7 @@ struct foo {
 class IntTypesTest(TestCaseWithCleanup):
     """Test correct parsing and generation of different integer types"""
 
-    @classmethod
-    def setUpClass(cls):
-        header_str = """
+    HEADER = """
 struct int_types {
     short t_short;
     short int t_short_int;
@@ -241,7 +315,10 @@ struct int_types {
     long int unsigned long t_long_int_u_long;
 };
 """
-        cls.module = generate(header_str)
+
+    @classmethod
+    def setUpClass(cls):
+        cls.module, _, _ = generate_combined()
 
     def test_int_types(self):
         """Test if different integer types are parsed correctly"""
@@ -266,9 +343,7 @@ struct int_types {
 
 class SimpleMacrosTest(TestCaseWithCleanup):
 
-    @classmethod
-    def setUpClass(cls):
-        header_str = """
+    HEADER = """
 #define A 1
 #define B(x,y) x+y
 #define C(a,b,c) a?b:c
@@ -282,19 +357,23 @@ class SimpleMacrosTest(TestCaseWithCleanup):
 #define subcall_macro_minus(x,y) minus_macro(x,y)
 #define subcall_macro_minus_plus(x,y,z) (minus_macro(x,y)) + (z)
 """
-        cls.module = generate(header_str)
-        cls.json, _ = generate(header_str, lang="json")
+
+    @classmethod
+    def setUpClass(cls):
+        cls.module, cls.json, _ = generate_combined()
+        # index by name once, keeping the first entry on duplicates (iterate in reverse so earlier entries win)
+        cls.json_index = {e["name"]: e for e in reversed(cls.json)}
 
     def _json(self, name):
-        for i in SimpleMacrosTest.json:
-            if i["name"] == name:
-                return i
-        raise KeyError("Could not find JSON entry")
+        try:
+            return SimpleMacrosTest.json_index[name]
+        except KeyError:
+            raise KeyError(f"Could not find JSON entry {name!r}") from None
 
     @classmethod
     def tearDownClass(cls):
         super().tearDownClass()
-        del cls.json
+        del cls.json, cls.json_index
 
     def test_macro_constant_int(self):
         self.assertEqual(self.module.A, 1)
@@ -343,60 +422,27 @@ class SimpleMacrosTest(TestCaseWithCleanup):
             {"args": ["x"], "body": "('funny' + x)", "name": "funny", "type": "macro_function"},
         )
 
-    def test_macro_math_multipler(self):
-        x, y = 2, 5
-        self.assertEqual(self.module.multipler_macro(x, y), x * y)
-
-    def test_macro_math_multiplier_json(self):
-        self.assertEqual(
-            self._json("multipler_macro"),
-            {
-                "args": ["x", "y"],
-                "body": "(x * y)",
-                "name": "multipler_macro",
-                "type": "macro_function",
-            },
-        )
-
-    def test_macro_math_minus(self):
-        x, y = 2, 5
-        self.assertEqual(self.module.minus_macro(x, y), x - y)
-
-    def test_macro_math_minus_json(self):
-        self.assertEqual(
-            self._json("minus_macro"),
-            {
-                "args": ["x", "y"],
-                "body": "(x - y)",
-                "name": "minus_macro",
-                "type": "macro_function",
-            },
-        )
-
-    def test_macro_math_divide(self):
-        x, y = 2, 5
-        self.assertEqual(self.module.divide_macro(x, y), x / y)
-
-    def test_macro_math_divide_json(self):
-        self.assertEqual(
-            self._json("divide_macro"),
-            {
-                "args": ["x", "y"],
-                "body": "(x / y)",
-                "name": "divide_macro",
-                "type": "macro_function",
-            },
-        )
+    # binary operator macros, with the python equivalent and the operator symbol in the json body
+    MATH_MACROS = [
+        ("multipler_macro", operator.mul, "*"),
+        ("minus_macro", operator.sub, "-"),
+        ("divide_macro", operator.truediv, "/"),
+        ("mod_macro", operator.mod, "%"),
+    ]
 
-    def test_macro_math_mod(self):
+    def test_macro_math(self):
         x, y = 2, 5
-        self.assertEqual(self.module.mod_macro(x, y), x % y)
-
-    def test_macro_math_mod_json(self):
-        self.assertEqual(
-            self._json("mod_macro"),
-            {"args": ["x", "y"], "body": "(x % y)", "name": "mod_macro", "type": "macro_function"},
-        )
+        for name, op, _ in self.MATH_MACROS:
+            with self.subTest(macro=name):
+                self.assertEqual(getattr(self.module, name)(x, y), op(x, y))
+
+    def test_macro_math_json(self):
+        for name, _, symbol in self.MATH_MACROS:
+            with self.subTest(macro=name):
+                self.assertEqual(
+                    self._json(name),
+                    {"args": ["x", "y"], "body": f"(x {symbol} y)", "name": name, "type": "macro_function"},
+                )
 
     def test_macro_subcall_simple(self):
         """Test use of a constant valued macro within a macro"""
@@ -456,19 +502,24 @@ class SimpleMacrosTest(TestCaseWithCleanup):
         )
 
 
+@functools.lru_cache(maxsize=None)
 def compute_packed(modulo, fields):
-    packs = [
-        (
-            modulo * int(ctypes.sizeof(f) / modulo)
-            + modulo * (1 if (ctypes.sizeof(f) % modulo) else 0)
-        )
-        for f in fields
-    ]
-    return sum(packs)
+    # sum of field sizes, each rounded up to a multiple of modulo (ceiling division via negated floor division)
+    # fields must be given as tuple, for hashability
+    return sum(-(-ctypes.sizeof(f) // modulo) * modulo for f in fields)
 
 
 class StructuresTest(TestCaseWithCleanup):
 
+    # expected _fields_ of struct foo
+    EXPECTED_FIELDS = [
+        ("a", ctypes.c_int),
+        ("b", ctypes.c_char),
+        ("c", ctypes.c_int),
+        ("d", ctypes.c_int, 15),
+        ("unnamed_1", ctypes.c_int, 17),
+    ]
+
     @classmethod
     def setUpClass(cls):
         header_str = """
@@ -548,8 +599,7 @@ typedef struct {
     char b;
 } BAR0, *PBAR0;
 """
-        cls.module = generate(header_str)
-        cls.json, cls.tmp_header_path = generate(header_str, lang="json")
+        cls.module, cls.json, cls.tmp_header_path = generate_multi(header_str, name=cls.__name__)
 
     def test_struct_json(self):
         json_ans = json_expects.get_ans_struct(self.tmp_header_path)
@@ -558,22 +608,13 @@ typedef struct {
     def test_fields(self):
         """Test whether fields are built correctly."""
         struct_foo = StructuresTest.module.struct_foo
-        self.assertEqual(
-            struct_foo._fields_,
-            [
-                ("a", ctypes.c_int),
-                ("b", ctypes.c_char),
-                ("c", ctypes.c_int),
-                ("d", ctypes.c_int, 15),
-                ("unnamed_1", ctypes.c_int, 17),
-            ],
-        )
+        self.assertEqual(struct_foo._fields_, self.EXPECTED_FIELDS)
 
     def test_pack(self):
         """Test whether gcc __attribute__((packed)) is interpreted correctly."""
         module = StructuresTest.module
-        unpacked_size = compute_packed(4, [ctypes.c_int] * 3 + [ctypes.c_char])
-        packed_size = compute_packed(1, [ctypes.c_int] * 3 + [ctypes.c_char])
+        unpacked_size = compute_packed(4, (ctypes.c_int, ) * 3 + (ctypes.c_char, ))
+        packed_size = compute_packed(1, (ctypes.c_int, ) * 3 + (ctypes.c_char, ))
 
         struct_foo = module.struct_foo
         struct_packed_foo = module.struct_packed_foo
@@ -591,9 +632,9 @@ typedef struct {
     def test_pragma_pack(self):
         """Test whether #pragma pack(...) is interpreted correctly."""
         module = StructuresTest.module
-        packed4_size = compute_packed(4, [ctypes.c_int] * 3 + [ctypes.c_char])
-        packed2_size = compute_packed(2, [ctypes.c_int] * 3 + [ctypes.c_char])
-        unpacked_size = compute_packed(4, [ctypes.c_int] * 3 + [ctypes.c_char])
+        packed4_size = compute_packed(4, (ctypes.c_int, ) * 3 + (ctypes.c_char, ))
+        packed2_size = compute_packed(2, (ctypes.c_int, ) * 3 + (ctypes.c_char, ))
+        unpacked_size = compute_packed(4, (ctypes.c_int, ) * 3 + (ctypes.c_char, ))
 
         pragma_packed_foo_t = module.pragma_packed_foo_t
         struct_pragma_packed_foo2 = module.struct_pragma_packed_foo2
@@ -636,8 +677,7 @@ typedef enum {
     TEST_2
 } test_status_t;
 """
-        cls.module = generate(header_str)
-        cls.json, cls.tmp_header_path = generate(header_str, lang="json")
+        cls.module, cls.json, cls.tmp_header_path = generate_multi(header_str, name=cls.__name__)
 
     @classmethod
     def tearDownClass(cls):
@@ -665,7 +705,7 @@ void * __attribute__((stdcall)) foo3(void);
 void * __attribute__((stdcall)) * foo4(void);
 void foo5(void) __attribute__((__stdcall__));
 """
-        cls.json, _ = generate(header_str, lang="json")
+        cls.json, _ = generate(header_str, lang="json", name=cls.__name__)
 
     @classmethod
     def tearDownClass(cls):
@@ -690,7 +730,7 @@ typedef struct {
 typedef int (*FP_CustomArgtype)(MyStructT* my_struct);
 typedef MyStructT (*FP_CustomRestype)(void);
 """
-        cls.module = generate(header_str)
+        cls.module = generate(header_str, name=cls.__name__)
 
     def test_primitive(self):
         """Test passthrough of primitive value."""
@@ -725,7 +765,7 @@ struct foo {
     int a;
 };
 """
-        cls.module = generate(header_str)  # ["--all-headers"]
+        cls.module = generate(header_str, name=cls.__name__)  # ["--all-headers"]
 
     def test_longdouble_type(self):
         """Test if long double is parsed correctly"""
@@ -770,10 +810,44 @@ class CommandParserTest(unittest.TestCase):
         self.assertGreater(len(out), 3000)  # it's long, so it'll be the generated help
         self.assertEqual(err, "")
 
+    def test_symbol_rules_invalid(self):
+        """Test that malformed --symbol-rules entries are rejected as usage errors"""
+        cases = [
+            ("foo=x", "Invalid symbol rule 'foo=x', expected RULE=exp"),
+            ("yes", "Invalid symbol rule 'yes', expected RULE=exp"),
+            ("yes=(", "Invalid regular expression in symbol rule 'yes=('"),
+        ]
+        for entry, message in cases:
+            with self.subTest(entry=entry):
+                out, err, rc = self._run(["--symbol-rules", entry])
+                self.assertEqual(rc, 2)
+                self.assertEqual(out, "")
+                self.assertIn(f"error: argument --symbol-rules: {message}", err)
+
+    def test_api_symbol_rules_str(self):
+        """Test that api_main() accepts symbol rules as RULE=exp strings"""
+        file_id = get_file_id(type(self).__name__)
+        header, output = TMP_DIR/f"in_header_{file_id}.h", TMP_DIR/f"out_bindings_{file_id}.py"
+        header.write_text("#define FOO 1\n#define BAR 2\n", encoding="utf-8")
+        with redirect_stderr(io.StringIO()):
+            api_main({"headers": [header], "output": output, "symbol_rules": ["never=FOO"]})
+        module = module_from_code("api_symbol_rules", output.read_text(encoding="utf-8"))
+        self.assertEqual(module.BAR, 2)
+        self.assertFalse(hasattr(module, "FOO"))
+
 
 class ConstantsTest(TestCaseWithCleanup):
     """Test correct parsing and generation of NULL"""
 
+    # expected _fields_ of struct foo
+    EXPECTED_FIELDS = [
+        ("a", ctypes.c_int),
+        ("b", ctypes.c_char),
+        ("c", ctypes.c_int, 2),
+        ("d", ctypes.c_int, 15),
+        ("unnamed_1", ctypes.c_int, 17),
+    ]
+
     @classmethod
     def setUpClass(cls):
         header_str = """
@@ -802,7 +876,7 @@ struct foo {
 
 #define CHAR_CONST u'🍌'
 """
-        cls.module = generate(header_str)
+        cls.module = generate(header_str, name=cls.__name__)
 
     def test_integer_constants(self):
         """Test if integer constants are parsed correctly"""
@@ -827,16 +901,7 @@ struct foo {
     def test_struct_fields(self):
         """Test whether fields are built correctly."""
         struct_foo = ConstantsTest.module.struct_foo
-        self.assertEqual(
-            struct_foo._fields_,
-            [
-                ("a", ctypes.c_int),
-                ("b", ctypes.c_char),
-                ("c", ctypes.c_int, 2),
-                ("d", ctypes.c_int, 15),
-                ("unnamed_1", ctypes.c_int, 17),
-            ],
-        )
+        self.assertEqual(struct_foo._fields_, self.EXPECTED_FIELDS)
 
     def test_character_constants(self):
         """Test char constants"""
@@ -849,7 +914,7 @@ class NULLTest(TestCaseWithCleanup):
     @classmethod
     def setUpClass(cls):
         header_str = "#define A_NULL_MACRO NULL\n"
-        cls.module = generate(header_str)  # ["--all-headers"]
+        cls.module = generate(header_str, name=cls.__name__)  # ["--all-headers"]
 
     def test_null_type(self):
         """Test if NULL is parsed correctly"""
@@ -871,8 +936,7 @@ class MacromanEncodeTest(TestCaseWithCleanup):
 
         """
 
-        with open(cls.mac_roman_file, "wb") as mac_file:
-            mac_file.write(mac_header_str)
+        cls.mac_roman_file.write_bytes(mac_header_str)
 
         header_str = f"""
         #include "{cls.mac_roman_file}"
@@ -881,12 +945,7 @@ class MacromanEncodeTest(TestCaseWithCleanup):
 
         """
 
-        cls.module = generate(header_str)
-
-    @classmethod
-    def tearDownClass(cls):
-        super().tearDownClass()
-        if CLEANUP_OK: cls.mac_roman_file.unlink()
+        cls.module = generate(header_str, name=cls.__name__)
 
     def test_macroman_encoding_source(self):
         module = MacromanEncodeTest.module
@@ -903,10 +962,6 @@ class TestEmptyHeader(unittest.TestCase):
         cls.outfile = TMP_DIR/"empty_output.py"
         cls.infile.write_text("// this is an empty header\n")
     
-    @classmethod
-    def tearDownClass(cls):
-        if CLEANUP_OK: cls.infile.unlink()
-    
     def test_empty_header(self):
         with self.assertRaises(RuntimeError, msg="No target members found."):
             ctypesgen_main(["-i", self.infile, "-o", self.outfile])
@@ -922,7 +977,7 @@ class TestDefUndef(unittest.TestCase):
     """
     
     def test_ordered_passthrough(self):
-        m = generate("", [*"-D A=1 B=2 C=3 -U B -D B=0 -U C".split(" "), "--symbol-rules", "yes=A|B|C"])
+        m = generate("", [*"-D A=1 B=2 C=3 -U B -D B=0 -U C".split(" "), "--symbol-rules", "yes=A|B|C"], name=type(self).__name__)
         self.assertEqual(m.A, 1)
         self.assertEqual(m.B, 0)
         self.assertFalse(hasattr(m, "C"))
@@ -930,19 +985,19 @@ class TestDefUndef(unittest.TestCase):
     @requires_gcc
     def test_default_undef(self):
         # this actually works because the def/undef are taken over into the output, so we won't get a "no target members" exception.
-        m = generate("", ["--symbol-rules", "yes=__GNUC__"], cpp=f"gcc -E", allow_gnuc=False)
+        m = generate("", ["--symbol-rules", "yes=__GNUC__"], cpp=f"gcc -E", allow_gnuc=False, name=type(self).__name__)
         self.assertFalse(hasattr(m, "__GNUC__"))
     
     @requires_gcc
     def test_override_default_undef(self):
-        m = generate("", ["--symbol-rules", "yes=__GNUC__"], cpp=f"gcc -E", allow_gnuc=True)
+        m = generate("", ["--symbol-rules", "yes=__GNUC__"], cpp=f"gcc -E", allow_gnuc=True, name=type(self).__name__)
         self.assertIsInstance(m.__GNUC__, int)  # this will be the GCC major version
     
     def test_default_def(self):
-        m = generate("", ["--symbol-rules", "yes=CTYPESGEN"])
+        m = generate("", ["--symbol-rules", "yes=CTYPESGEN"], name=type(self).__name__)
         self.assertEqual(m.CTYPESGEN, 1)
     
     def test_override_default_def(self):
         # here we have to define a placeholder to bypass the "no target members" exception
-        m = generate("#define PLACEHOLDER 1", ["-X", "CTYPESGEN", "--symbol-rules", "yes=CTYPESGEN"])
+        m = generate("#define PLACEHOLDER 1", ["-X", "CTYPESGEN", "--symbol-rules", "yes=CTYPESGEN"], name=type(self).__name__)
         self.assertFalse(hasattr(m, "CTYPESGEN"))